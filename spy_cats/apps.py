@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class SpyCatsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'spy_cats'
+
+    def ready(self):
+        from . import reference  # noqa: F401 connects the invalidation signals
+
+        if getattr(settings, 'WARM_UP_ON_STARTUP', False):
+            from .startup import warm_up
+            warm_up()
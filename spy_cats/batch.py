@@ -0,0 +1,56 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+MIN_ID = -2 ** 63
+MAX_ID = 2 ** 63 - 1
+
+
+class BatchRetrieveMixin:
+    """
+    Adds a `batch` action that fetches many objects by id with a constant
+    number of queries: GET ?ids=1,2,3 (or repeated ids=) or POST {"ids": [...]}
+    for large id sets. Results keep the input order; unknown ids are listed
+    under "missing".
+    """
+    read_actions = ('batch',)
+
+    def get_batch_ids(self, request):
+        if request.method == 'POST':
+            if not isinstance(request.data, dict):
+                return None
+            ids = request.data.get('ids')
+            if not isinstance(ids, list):
+                return None
+            if not all(isinstance(value, int) and not isinstance(value, bool) for value in ids):
+                return None
+        else:
+            raw_ids = [part for value in request.query_params.getlist('ids') for part in value.split(',') if part]
+            try:
+                ids = [int(value) for value in raw_ids]
+            except ValueError:
+                return None
+        # Primary keys are 64-bit; larger values would overflow the database driver.
+        if not all(MIN_ID <= value <= MAX_ID for value in ids):
+            return None
+        return list(dict.fromkeys(ids))
+
+    @action(detail=False, methods=['get', 'post'])
+    def batch(self, request, *args, **kwargs):
+        ids = self.get_batch_ids(request)
+        if not ids:
+            return Response({"detail": "ids must be a non-empty list of integers."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        max_ids = getattr(settings, 'BATCH_MAX_IDS', 1000)
+        if len(ids) > max_ids:
+            return Response({"detail": f"At most {max_ids} ids can be fetched at once."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        objects = {obj.id: obj for obj in self.get_queryset().filter(id__in=ids)}
+        found = [objects[pk] for pk in ids if pk in objects]
+        serializer = self.get_serializer(found, many=True)
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in objects],
+        })
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+BREEDS_URL = 'https://api.thecatapi.com/v1/breeds'
+
+_catalog = None
+_fetched_at = 0.0
+
+
+class BreedCatalogUnavailable(ValidationError):
+    pass
+
+
+def fetch_breed_names():
+    import requests
+
+    response = requests.get(BREEDS_URL)
+    if response.status_code != 200:
+        return None
+    return {breed['name'].lower() for breed in response.json()}
+
+
+def get_breed_names():
+    """
+    Return the lower-cased breed names known to TheCatAPI, or None if the
+    catalog is unavailable. With BREED_CATALOG_TTL set the catalog is kept
+    in process memory for that many seconds instead of fetched per call.
+    """
+    global _catalog, _fetched_at
+    ttl = getattr(settings, 'BREED_CATALOG_TTL', 0)
+    if ttl and _catalog is not None and time.monotonic() - _fetched_at < ttl:
+        return _catalog
+
+    names = fetch_breed_names()
+    if ttl and names is not None:
+        _catalog, _fetched_at = names, time.monotonic()
+    return names
+
+
+def clear_breed_catalog():
+    global _catalog, _fetched_at
+    _catalog, _fetched_at = None, 0.0
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+POLL_INTERVAL = 0.05
+
+
+def get_ttl():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+
+
+def get_wait_timeout():
+    return getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 10)
+
+
+def get_lock_timeout():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 60))
+
+
+def fingerprint(request):
+    payload = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def mark_transient(response):
+    """Flag a response caused by a transient failure so it is not stored for replay."""
+    response.idempotency_transient = True
+    return response
+
+
+def replay(record):
+    response = Response(record.response_body, status=record.status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def claim(key, request, digest):
+    """Insert a pending record for the key, or return the one that already holds it."""
+    now = timezone.now()
+    lookup = {'key': key, 'method': request.method, 'path': request.path}
+    IdempotencyKey.objects.filter(created_at__lt=now - get_ttl()).delete()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(fingerprint=digest, **lookup)
+        return None
+    except IntegrityError:
+        return IdempotencyKey.objects.filter(**lookup).first()
+
+
+def is_abandoned(record):
+    return record.status_code is None and record.created_at < timezone.now() - get_lock_timeout()
+
+
+def reclaim(record):
+    """
+    Take over a pending record whose lease ran out, e.g. because the worker
+    handling it was killed. The conditional update makes only one retry win.
+    """
+    now = timezone.now()
+    return IdempotencyKey.objects.filter(
+        pk=record.pk, status_code__isnull=True, created_at__lt=now - get_lock_timeout(),
+    ).update(created_at=now) == 1
+
+
+def wait_for_completion(record):
+    deadline = time.monotonic() + get_wait_timeout()
+    while (record is not None and record.status_code is None and not is_abandoned(record)
+           and time.monotonic() < deadline):
+        time.sleep(POLL_INTERVAL)
+        record = IdempotencyKey.objects.filter(pk=record.pk).first()
+    return record
+
+
+def idempotent(view_method):
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.META.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({"detail": "Idempotency-Key must be at most 255 characters."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        digest = fingerprint(request)
+        existing = claim(key, request, digest)
+        if existing is not None:
+            if existing.fingerprint != digest:
+                return Response({"detail": "Idempotency-Key was already used with a different request body."},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            # Waiting on another request must not pin a write slot (see BoundedWriteConcurrencyMixin).
+            release_slot = getattr(self, 'release_held_write_slot', None)
+            if release_slot is not None:
+                release_slot()
+            existing = wait_for_completion(existing)
+            if existing is None:
+                return Response({"detail": "The original request failed, retry it."},
+                                status=status.HTTP_409_CONFLICT, headers={'Retry-After': '1'})
+            if existing.status_code is not None:
+                return replay(existing)
+            if not (is_abandoned(existing) and reclaim(existing)):
+                return Response({"detail": "A request with this Idempotency-Key is still in progress."},
+                                status=status.HTTP_409_CONFLICT, headers={'Retry-After': '1'})
+            take_slot = getattr(self, 'take_write_slot', None)
+            if take_slot is not None:
+                try:
+                    take_slot()
+                except Exception:
+                    IdempotencyKey.objects.filter(pk=existing.pk).delete()
+                    raise
+
+        lookup = {'key': key, 'method': request.method, 'path': request.path}
+        try:
+            try:
+                response = view_method(self, request, *args, **kwargs)
+            except Exception as exc:
+                response = self.handle_exception(exc)
+        except Exception:
+            IdempotencyKey.objects.filter(**lookup).delete()
+            raise
+
+        if response.status_code >= 500 or getattr(response, 'idempotency_transient', False):
+            IdempotencyKey.objects.filter(**lookup).delete()
+        else:
+            IdempotencyKey.objects.filter(**lookup).update(status_code=response.status_code,
+                                                           response_body=response.data)
+        return response
+
+    return wrapper
@@ -0,0 +1,57 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from spy_cats.models import Mission, Target, ArchivedMission, ArchivedTarget
+
+
+class Command(BaseCommand):
+    help = "Move completed missions older than a threshold into the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30,
+                            help="Archive missions completed more than this many days ago.")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Number of missions moved per transaction.")
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help="Seconds to sleep between batches so writers can get the lock.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        batch_size = options['batch_size']
+        total = 0
+
+        while True:
+            moved = self.archive_batch(cutoff, batch_size)
+            total += moved
+            if moved < batch_size:
+                break
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} missions."))
+
+    def archive_batch(self, cutoff, batch_size):
+        with transaction.atomic():
+            missions = list(
+                Mission.objects.filter(is_complete=True, completed_at__lt=cutoff)
+                .order_by('id')[:batch_size]
+            )
+            if not missions:
+                return 0
+            mission_ids = [mission.id for mission in missions]
+
+            ArchivedMission.objects.bulk_create([
+                ArchivedMission(id=mission.id, cat_id=mission.cat_id, completed_at=mission.completed_at)
+                for mission in missions
+            ])
+            ArchivedTarget.objects.bulk_create([
+                ArchivedTarget(mission_id=target.mission_id, name=target.name, country_id=target.country_id,
+                               notes=target.notes, is_complete=target.is_complete)
+                for target in Target.objects.filter(mission_id__in=mission_ids).order_by('id')
+            ])
+            Mission.objects.filter(id__in=mission_ids).delete()
+        return len(missions)
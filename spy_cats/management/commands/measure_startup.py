@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from spy_cats.startup import measure_startup
+
+
+class Command(BaseCommand):
+    help = "Measure import time and first-request latency of a fresh worker using -X importtime."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--settings-module', default='test_task.settings_production',
+                            help="Settings module the measured worker boots with.")
+        parser.add_argument('--path', default='/', help="Path of the first request.")
+        parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list.")
+        parser.add_argument('--no-warm-up', action='store_true', help="Disable the startup warm-up hook.")
+
+    def handle(self, *args, **options):
+        env = {'DJANGO_WARM_UP': '0'} if options['no_warm_up'] else {}
+        report = measure_startup(options['settings_module'], options['path'], env)
+
+        self.stdout.write(f"Import time (self): {report['import_ms']:.1f} ms")
+        self.stdout.write(f"Boot time:           {report['boot_ms']:.1f} ms")
+        self.stdout.write(f"First request:       {report['first_request_ms']:.1f} ms "
+                          f"(status {report['status_code']})")
+        self.stdout.write("Slowest imports (cumulative):")
+        slowest = sorted(report['imports'], key=lambda module: module['cumulative_us'], reverse=True)
+        for module in slowest[:options['top']]:
+            self.stdout.write(f"  {module['cumulative_us'] / 1000:8.1f} ms  {module['module']}")
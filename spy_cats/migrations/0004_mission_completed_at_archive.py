@@ -0,0 +1,46 @@
+# Generated by Django 5.1.3 on 2026-10-19 05:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_completed_at(apps, schema_editor):
+    Mission = apps.get_model('spy_cats', 'Mission')
+    Mission.objects.filter(is_complete=True, completed_at__isnull=True).update(completed_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spy_cats', '0003_country_alter_target_country'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mission',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_completed_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ArchivedMission',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('cat', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='spy_cats.spycat')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedTarget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('notes', models.TextField(blank=True)),
+                ('is_complete', models.BooleanField(default=True)),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='spy_cats.country')),
+                ('mission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='targets', to='spy_cats.archivedmission')),
+            ],
+        ),
+    ]
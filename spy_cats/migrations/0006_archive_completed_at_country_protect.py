@@ -0,0 +1,22 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spy_cats', '0005_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedmission',
+            name='completed_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedtarget',
+            name='country',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='spy_cats.country'),
+        ),
+    ]
@@ -1,5 +1,7 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 class Breed(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -19,10 +21,16 @@ class SpyCat(models.Model):
 class Mission(models.Model):
     cat = models.ForeignKey(SpyCat, on_delete=models.SET_NULL, null=True, blank=True)
     is_complete = models.BooleanField(default=False)
+    completed_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     def __str__(self):
         return f"Mission {self.id} assigned to {self.cat.name if self.cat else 'Unassigned'}"
 
+    def save(self, *args, **kwargs):
+        if self.is_complete and self.completed_at is None:
+            self.completed_at = timezone.now()
+        super().save(*args, **kwargs)
+
     def check_completion(self):
         if not self.targets.filter(is_complete=False).exists():
             self.is_complete = True
@@ -47,4 +55,43 @@ class Target(models.Model):
     is_complete = models.BooleanField(default=False)
 
     def __str__(self):
-        return f"Target {self.name} in {self.country.name} for Mission {self.mission.id}"
\ No newline at end of file
+        return f"Target {self.name} in {self.country.name} for Mission {self.mission.id}"
+
+
+class ArchivedMission(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    cat = models.ForeignKey(SpyCat, on_delete=models.SET_NULL, null=True, blank=True)
+    completed_at = models.DateTimeField(db_index=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived mission {self.id}"
+
+
+class ArchivedTarget(models.Model):
+    mission = models.ForeignKey(ArchivedMission, on_delete=models.CASCADE, related_name='targets')
+    name = models.CharField(max_length=100)
+    country = models.ForeignKey(Country, on_delete=models.PROTECT)
+    notes = models.TextField(blank=True)
+    is_complete = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"Archived target {self.name} for Mission {self.mission_id}"
+
+
+class IdempotencyKey(models.Model):
+    key = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'method', 'path'], name='unique_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.path} [{self.key}]"
@@ -0,0 +1,221 @@
+import cProfile
+import hmac
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.http import Http404, HttpResponse, JsonResponse
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+# cProfile is process-wide on Python 3.12+, so only one capture runs at a time.
+capture_lock = threading.Lock()
+
+
+class Capture:
+    def __init__(self, action, profile, stacks, duration):
+        self.action = action
+        self.profile = profile
+        self.stacks = stacks
+        self.duration = duration
+        self.captured_at = time.time()
+
+
+class ProfileStore:
+    """Bounded ring buffer of request captures, aggregated per view action on read."""
+
+    def __init__(self, size):
+        self.captures = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def resize(self, size):
+        with self.lock:
+            if self.captures.maxlen != size:
+                self.captures = deque(self.captures, maxlen=size)
+
+    def add(self, capture):
+        with self.lock:
+            self.captures.append(capture)
+
+    def clear(self):
+        with self.lock:
+            self.captures.clear()
+
+    def for_action(self, action):
+        with self.lock:
+            return [capture for capture in self.captures if capture.action == action]
+
+    def summary(self):
+        with self.lock:
+            captures = list(self.captures)
+        actions = {}
+        for capture in captures:
+            entry = actions.setdefault(capture.action, {'captures': 0, 'total_ms': 0.0, 'samples': 0})
+            entry['captures'] += 1
+            entry['total_ms'] += capture.duration * 1000
+            entry['samples'] += sum(capture.stacks.values())
+        return actions
+
+    def pstats_dump(self, action):
+        captures = self.for_action(action)
+        if not captures:
+            return None
+        stats = pstats.Stats(captures[0].profile)
+        for capture in captures[1:]:
+            stats.add(capture.profile)
+        return marshal.dumps(stats.stats)
+
+    def collapsed_stacks(self, action):
+        captures = self.for_action(action)
+        if not captures:
+            return None
+        stacks = Counter()
+        for capture in captures:
+            stacks.update(capture.stacks)
+        return ''.join(f'{stack} {count}\n' for stack, count in sorted(stacks.items()))
+
+
+store = ProfileStore(getattr(settings, 'PROFILING_BUFFER_SIZE', 100))
+
+
+def format_frame(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})'
+
+
+class StackSampler(threading.Thread):
+    """Samples the call stack of one thread at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                frames.append(format_frame(frame))
+                frame = frame.f_back
+            if frames:
+                self.stacks[';'.join(reversed(frames))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def get_action(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.view_name
+    actions = getattr(match.func, 'actions', None) or {}
+    return f"{view_class.__name__}.{actions.get(request.method.lower(), request.method.lower())}"
+
+
+def token_matches(value):
+    token = getattr(settings, 'PROFILING_TOKEN', None)
+    return bool(token and value) and hmac.compare_digest(value.encode(), token.encode())
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profiling. With PROFILING_ENABLED off the middleware
+    removes itself from the chain at startup, so it costs nothing. Otherwise
+    a request is profiled when its X-Profile header matches PROFILING_TOKEN
+    or it is picked by PROFILING_SAMPLE_RATE. Enabling profiling without a
+    token is a configuration error. Only one request per process is captured
+    at a time; requests arriving meanwhile, or when another profiler is
+    already active, are served unprofiled.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed()
+        if not getattr(settings, 'PROFILING_TOKEN', None):
+            raise ImproperlyConfigured("PROFILING_ENABLED requires PROFILING_TOKEN to be set.")
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.interval = getattr(settings, 'PROFILING_SAMPLE_INTERVAL', 0.005)
+        store.resize(getattr(settings, 'PROFILING_BUFFER_SIZE', 100))
+
+    def should_profile(self, request):
+        header = request.META.get(PROFILE_HEADER)
+        if header is not None:
+            return token_matches(header)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self.should_profile(request) or not capture_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self.capture(request)
+        finally:
+            capture_lock.release()
+
+    def capture(self, request):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool (a debugger, coverage) already holds the hook.
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        try:
+            sampler.start()
+            start = time.perf_counter()
+            try:
+                response = self.get_response(request)
+            finally:
+                duration = time.perf_counter() - start
+                sampler.stop()
+        finally:
+            profile.disable()
+        profile.create_stats()
+        store.add(Capture(get_action(request), profile, sampler.stacks, duration))
+        return response
+
+
+def check_access(request):
+    if not getattr(settings, 'PROFILING_ENABLED', False):
+        raise Http404
+    if not token_matches(request.headers.get('X-Profile-Token')):
+        raise Http404
+
+
+def profile_list(request):
+    check_access(request)
+    return JsonResponse(store.summary())
+
+
+def profile_pstats(request, action):
+    check_access(request)
+    data = store.pstats_dump(action)
+    if data is None:
+        raise Http404
+    response = HttpResponse(data, content_type='application/octet-stream')
+    response['Content-Disposition'] = f'attachment; filename="{action}.pstats"'
+    return response
+
+
+def profile_collapsed(request, action):
+    check_access(request)
+    data = store.collapsed_stacks(action)
+    if data is None:
+        raise Http404
+    response = HttpResponse(data, content_type='text/plain')
+    response['Content-Disposition'] = f'attachment; filename="{action}.collapsed"'
+    return response
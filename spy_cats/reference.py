@@ -0,0 +1,92 @@
+import time
+from uuid import uuid4
+
+from django.conf import settings
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Breed, Country
+
+
+class ReferenceCache:
+    """
+    Process-local name <-> id maps for a small lookup table with a `name`
+    column. Each process compares its copy against a version stamp kept in
+    the shared cache and reloads the whole table when the stamp changes;
+    saving or deleting a row bumps the stamp. The stamp is read at most once
+    per REFERENCE_CACHE_CHECK_INTERVAL seconds rather than per lookup, so
+    other workers' changes show up within that interval. Maps loaded inside
+    a transaction are only trusted until that atomic block exits, so rows
+    that get rolled back never outlive it.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f'reference_version_{model._meta.model_name}'
+        self.version = None
+        self.owner = None
+        self.checked_at = 0.0
+        self.ids_by_name = {}
+        self.names_by_id = {}
+
+    def __deepcopy__(self, memo):
+        # Serializer fields deep-copy their arguments; all copies must share the one cache.
+        return self
+
+    def current_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid4().hex, None)
+            version = cache.get(self.version_key)
+        return version
+
+    def refresh(self):
+        block = connection.atomic_blocks[-1] if connection.in_atomic_block else None
+        trusted = self.version is not None and self.owner in (None, block)
+        now = time.monotonic()
+        if trusted and now - self.checked_at < getattr(settings, 'REFERENCE_CACHE_CHECK_INTERVAL', 1.0):
+            return
+        version = self.current_version()
+        self.checked_at = now
+        if trusted and version == self.version:
+            return
+        rows = list(self.model.objects.values_list('id', 'name'))
+        self.ids_by_name = {name: pk for pk, name in rows}
+        self.names_by_id = {pk: name for pk, name in rows}
+        self.version, self.owner = version, block
+
+    def invalidate(self):
+        cache.set(self.version_key, uuid4().hex, None)
+        self.version = None
+
+    def get_or_create(self, name):
+        self.refresh()
+        pk = self.ids_by_name.get(name)
+        if pk is not None:
+            return self.model(id=pk, name=name)
+        instance, created = self.model.objects.get_or_create(name=name)
+        return instance
+
+    def get_name(self, pk):
+        self.refresh()
+        name = self.names_by_id.get(pk)
+        if name is None:
+            name = self.model.objects.filter(id=pk).values_list('name', flat=True).first()
+        return name
+
+
+breeds = ReferenceCache(Breed)
+countries = ReferenceCache(Country)
+
+
+def invalidate_reference_cache(sender, **kwargs):
+    reference_cache = breeds if sender is Breed else countries
+    reference_cache.invalidate()
+    transaction.on_commit(reference_cache.invalidate)
+
+
+for model in (Breed, Country):
+    post_save.connect(invalidate_reference_cache, sender=model, dispatch_uid=f'reference_cache_{model.__name__}_save')
+    post_delete.connect(invalidate_reference_cache, sender=model, dispatch_uid=f'reference_cache_{model.__name__}_delete')
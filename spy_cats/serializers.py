@@ -1,15 +1,23 @@
 from rest_framework import serializers
-from .models import SpyCat, Breed, Mission, Target, Country
+from .models import SpyCat, Mission, Target, ArchivedMission, ArchivedTarget
+from .reference import breeds, countries
 
-class BreedSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Breed
-        fields = ('id', 'name')
+
+class ReferenceField(serializers.Field):
+    """Renders a Breed or Country foreign key as {'id', 'name'} from the reference cache, without a join."""
+
+    def __init__(self, reference_cache, **kwargs):
+        self.reference_cache = reference_cache
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return {'id': value, 'name': self.reference_cache.get_name(value)}
 
 
 class SpyCatSerializer(serializers.ModelSerializer):
     breed_name = serializers.CharField(write_only=True)
-    breed = BreedSerializer(read_only=True)
+    breed = ReferenceField(breeds, source='breed_id')
 
     class Meta:
         model = SpyCat
@@ -29,14 +37,8 @@ class SpyCatSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class CountrySerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Country
-        fields = ('id', 'name')
-
-
 class TargetSerializer(serializers.ModelSerializer):
-    country = CountrySerializer(read_only=True)
+    country = ReferenceField(countries, source='country_id')
 
     class Meta:
         model = Target
@@ -50,3 +52,19 @@ class MissionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Mission
         fields = ('id', 'cat', 'is_complete', 'targets')
+
+
+class ArchivedTargetSerializer(serializers.ModelSerializer):
+    country = ReferenceField(countries, source='country_id')
+
+    class Meta:
+        model = ArchivedTarget
+        fields = ('id', 'name', 'country', 'notes', 'is_complete')
+
+
+class ArchivedMissionSerializer(serializers.ModelSerializer):
+    targets = ArchivedTargetSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ArchivedMission
+        fields = ('id', 'cat', 'completed_at', 'archived_at', 'targets')
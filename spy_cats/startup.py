@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_PATHS = (
+    '/', '/missions/', '/missions/1/', '/missions/batch/', '/missions/archive/',
+    '/spycats/', '/spycats/1/', '/spycats/batch/',
+)
+
+MEASURE_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from test_task.wsgi import application
+booted = time.perf_counter()
+modules = sorted(sys.modules)
+from django.test import Client
+response = Client().get(sys.argv[1])
+done = time.perf_counter()
+print(json.dumps({
+    'boot_ms': (booted - start) * 1000,
+    'first_request_ms': (done - booted) * 1000,
+    'status_code': response.status_code,
+    'modules_before_request': modules,
+}))
+"""
+
+
+def prime_url_resolver():
+    from django.urls import get_resolver, Resolver404
+
+    resolver = get_resolver()
+    for path in WARM_UP_PATHS:
+        try:
+            resolver.resolve(path)
+        except Resolver404:
+            pass
+
+
+def prime_serializer_fields():
+    from .serializers import SpyCatSerializer, MissionSerializer, ArchivedMissionSerializer
+
+    for serializer_class in (SpyCatSerializer, MissionSerializer, ArchivedMissionSerializer):
+        serializer_class().fields
+
+
+def prime_breed_catalog():
+    from .breeds import get_breed_names
+
+    try:
+        get_breed_names()
+    except Exception:
+        logger.warning("Could not prime the breed catalog.", exc_info=True)
+
+
+def warm_up():
+    """
+    Pay the one-off costs of the first request at process start: URL
+    resolver population, serializer field construction and the breed
+    catalog fetch. The catalog is fetched in a background thread so a slow
+    upstream does not block the worker from booting.
+    """
+    prime_url_resolver()
+    prime_serializer_fields()
+    if getattr(settings, 'BREED_CATALOG_TTL', 0):
+        threading.Thread(target=prime_breed_catalog, daemon=True).start()
+
+
+def parse_importtime(stderr):
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append({'module': name.strip(), 'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+    return modules
+
+
+def measure_startup(settings_module, path='/', env=None):
+    """
+    Boot the WSGI application in a fresh interpreter under `-X importtime`
+    and serve one request, returning boot and first-request latency along
+    with the per-module import times.
+    """
+    child_env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module, DJANGO_ALLOWED_HOSTS='testserver')
+    # The measured worker never signs anything, but production settings refuse to boot without a key.
+    child_env.setdefault('DJANGO_SECRET_KEY', 'measure-startup-only')
+    child_env.update(env or {})
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', MEASURE_SNIPPET, path],
+        cwd=settings.BASE_DIR, env=child_env, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['imports'] = parse_importtime(result.stderr)
+    booted_modules = set(report['modules_before_request'])
+    report['import_ms'] = sum(
+        module['self_us'] for module in report['imports'] if module['module'] in booted_modules
+    ) / 1000
+    return report
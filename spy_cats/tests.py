@@ -1,7 +1,33 @@
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 from rest_framework import status
+import hashlib
+import json
+import os
+import pstats
+import subprocess
+import sys
+import tempfile
+import threading
+import timeit
 from unittest.mock import patch
-from .models import SpyCat, Mission, Target, Breed, Country
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.db.models import ProtectedError
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from io import StringIO
+from .breeds import clear_breed_catalog, get_breed_names
+from . import reference as reference_module
+from .reference import ReferenceCache, breeds, countries
+from .profiling import ProfilingMiddleware, StackSampler, capture_lock, store as profile_store
+from .startup import measure_startup, prime_breed_catalog
+from .models import SpyCat, Mission, Target, Breed, Country, ArchivedMission, ArchivedTarget, IdempotencyKey
 
 class SpyCatViewSetTests(APITestCase):
     @patch('requests.get')
@@ -205,3 +231,579 @@ class MissionViewSetTests(APITestCase):
         response = self.client.post('/missions/', payload, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual({'detail': 'Each target must have a country_name.'}, response.data)
+
+
+class MissionArchiveTests(APITestCase):
+    def setUp(self):
+        breed = Breed.objects.create(name="Siamese")
+        self.spycat = SpyCat.objects.create(name="Whiskers", years_of_experience=5, salary="60000.00", breed=breed)
+        self.country = Country.objects.create(name="USA")
+
+    def create_mission(self, is_complete=False, days_ago=0):
+        mission = Mission.objects.create(cat=self.spycat, is_complete=is_complete)
+        if is_complete:
+            Mission.objects.filter(id=mission.id).update(completed_at=timezone.now() - timedelta(days=days_ago))
+        Target.objects.create(mission=mission, name="Target 1", country=self.country, is_complete=is_complete)
+        return mission
+
+    def test_completed_at_is_set_when_mission_completes(self):
+        mission = Mission.objects.create(cat=self.spycat, is_complete=False)
+        self.assertIsNone(mission.completed_at)
+        mission.check_completion()
+        self.assertIsNotNone(mission.completed_at)
+
+    def test_archive_command_moves_old_completed_missions(self):
+        old = self.create_mission(is_complete=True, days_ago=60)
+        recent = self.create_mission(is_complete=True, days_ago=1)
+        active = self.create_mission(is_complete=False)
+
+        out = StringIO()
+        call_command('archive_missions', days=30, batch_size=1, stdout=out)
+
+        self.assertIn("Archived 1 missions.", out.getvalue())
+        self.assertFalse(Mission.objects.filter(id=old.id).exists())
+        self.assertFalse(Target.objects.filter(mission_id=old.id).exists())
+        self.assertTrue(Mission.objects.filter(id__in=[recent.id, active.id]).count() == 2)
+        self.assertTrue(ArchivedMission.objects.filter(id=old.id, cat=self.spycat).exists())
+        self.assertEqual(ArchivedTarget.objects.filter(mission_id=old.id).count(), 1)
+
+    def test_archive_api(self):
+        old = self.create_mission(is_complete=True, days_ago=60)
+        call_command('archive_missions', days=30, stdout=StringIO())
+
+        response = self.client.get('/missions/archive/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['id'], old.id)
+        self.assertEqual(response.data['results'][0]['targets'][0]['country']['name'], "USA")
+
+        response = self.client.get(f'/missions/archive/{old.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['cat'], self.spycat.id)
+
+        response = self.client.get(f'/missions/{old.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_archive_api_is_paginated_newest_first(self):
+        missions = [self.create_mission(is_complete=True, days_ago=days) for days in (90, 60, 120)]
+        call_command('archive_missions', days=30, stdout=StringIO())
+
+        with patch('spy_cats.views.ArchivedMissionPagination.page_size', 2):
+            first = self.client.get('/missions/archive/')
+            second = self.client.get(first.data['next'])
+
+        self.assertEqual([m['id'] for m in first.data['results']], [missions[1].id, missions[0].id])
+        self.assertEqual([m['id'] for m in second.data['results']], [missions[2].id])
+        self.assertIsNone(second.data['next'])
+
+    def test_archived_targets_protect_their_country(self):
+        self.create_mission(is_complete=True, days_ago=60)
+        call_command('archive_missions', days=30, stdout=StringIO())
+        with self.assertRaises(ProtectedError):
+            self.country.delete()
+
+    def test_list_query_count_does_not_grow_with_history(self):
+        self.create_mission()
+        self.client.get('/missions/')
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/missions/')
+
+        for _ in range(20):
+            self.create_mission(is_complete=True, days_ago=60)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get('/missions/')
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+        call_command('archive_missions', days=30, stdout=StringIO())
+        response = self.client.get('/missions/')
+        self.assertEqual(len(response.data), 1)
+
+
+class IdempotencyKeyTests(APITestCase):
+    def setUp(self):
+        breed = Breed.objects.create(name="Siamese")
+        self.spycat = SpyCat.objects.create(name="Whiskers", years_of_experience=5, salary="60000.00", breed=breed)
+        self.mission_payload = {
+            "cat": self.spycat.id,
+            "targets": [{"name": "Target 1", "country_name": "USA", "notes": "", "is_complete": False}]
+        }
+
+    def test_replayed_mission_create_returns_original_response(self):
+        first = self.client.post('/missions/', self.mission_payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        second = self.client.post('/missions/', self.mission_payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Mission.objects.count(), 1)
+        self.assertEqual(Target.objects.count(), 1)
+
+    @patch('requests.get')
+    def test_replayed_spycat_create_skips_breed_validation(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = [{'name': 'Persian'}]
+        payload = {"name": "Mittens", "years_of_experience": 3, "salary": "40000.00", "breed_name": "Persian"}
+
+        first = self.client.post('/spycats/', payload, format='json', HTTP_IDEMPOTENCY_KEY='cat-1')
+        second = self.client.post('/spycats/', payload, format='json', HTTP_IDEMPOTENCY_KEY='cat-1')
+
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(SpyCat.objects.filter(name="Mittens").count(), 1)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        self.client.post('/missions/', self.mission_payload, format='json')
+        Mission.objects.update(is_complete=True)
+        self.client.post('/missions/', self.mission_payload, format='json')
+        self.assertEqual(Mission.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_key_reused_with_different_body(self):
+        self.client.post('/missions/', self.mission_payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.mission_payload['targets'][0]['name'] = "Target 2"
+        response = self.client.post('/missions/', self.mission_payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_update_is_idempotent(self):
+        mission = Mission.objects.create(cat=self.spycat)
+        country = Country.objects.create(name="USA")
+        payload = {"targets": [{"name": "Target 1", "country_id": country.id}]}
+        for _ in range(2):
+            response = self.client.patch(f'/missions/{mission.id}/', payload, format='json',
+                                         HTTP_IDEMPOTENCY_KEY='upd')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mission.targets.count(), 1)
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0)
+    def test_concurrent_duplicate_gets_conflict_while_in_progress(self):
+        IdempotencyKey.objects.create(key='abc', method='POST', path='/missions/',
+                                      fingerprint=self._fingerprint(self.mission_payload))
+        response = self.client.post('/missions/', self.mission_payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(Mission.objects.exists())
+
+    @override_settings(IDEMPOTENCY_LOCK_TIMEOUT=60)
+    def test_abandoned_pending_key_is_reclaimed(self):
+        record = IdempotencyKey.objects.create(key='abc', method='POST', path='/missions/',
+                                               fingerprint=self._fingerprint(self.mission_payload))
+        IdempotencyKey.objects.filter(pk=record.pk).update(created_at=timezone.now() - timedelta(seconds=61))
+
+        response = self.client.post('/missions/', self.mission_payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Mission.objects.count(), 1)
+        self.assertEqual(IdempotencyKey.objects.get(pk=record.pk).status_code, status.HTTP_201_CREATED)
+
+    @patch('requests.get')
+    def test_upstream_outage_is_not_replayed(self, mock_get):
+        mock_get.return_value.status_code = 500
+        payload = {"name": "Mittens", "years_of_experience": 3, "salary": "40000.00", "breed_name": "Persian"}
+
+        response = self.client.post('/spycats/', payload, format='json', HTTP_IDEMPOTENCY_KEY='cat-2')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = [{'name': 'Persian'}]
+        response = self.client.post('/spycats/', payload, format='json', HTTP_IDEMPOTENCY_KEY='cat-2')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(IDEMPOTENCY_KEY_TTL=0)
+    def test_expired_keys_are_evicted(self):
+        self.client.post('/missions/', self.mission_payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        Mission.objects.update(is_complete=True)
+        response = self.client.post('/missions/', self.mission_payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Mission.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def _fingerprint(self, payload):
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+THROTTLE_TEST_RATES = {
+    'DEFAULT_THROTTLE_CLASSES': ['spy_cats.throttling.TokenBucketThrottle'],
+    'DEFAULT_THROTTLE_RATES': {'read': '5/min', 'write': '3/min'},
+}
+
+
+@override_settings(REST_FRAMEWORK=THROTTLE_TEST_RATES, WRITE_CONCURRENCY_LIMIT=1)
+class LocMemThrottlingTests(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+        breed = Breed.objects.create(name="Siamese")
+        self.spycat = SpyCat.objects.create(name="Whiskers", years_of_experience=5, salary="60000.00", breed=breed)
+
+    def test_write_burst_is_throttled_with_retry_after(self):
+        for _ in range(3):
+            response = self.client.patch(f'/spycats/{self.spycat.id}/', {"salary": "1.00"}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.patch(f'/spycats/{self.spycat.id}/', {"salary": "1.00"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+        response = self.client.get('/spycats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_clients_have_separate_buckets(self):
+        for _ in range(4):
+            self.client.delete('/missions/999/')
+        self.assertEqual(self.client.delete('/missions/999/').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.client.delete('/missions/999/', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_write_concurrency_limit_sheds_load(self):
+        caches['default'].set('write_slot_0', 'other-request')
+        response = self.client.patch(f'/spycats/{self.spycat.id}/', {"salary": "1.00"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(caches['default'].get('write_slot_0'), 'other-request')
+
+    @override_settings(WRITE_CONCURRENCY_LIMIT=2)
+    def test_free_slot_is_used_when_another_is_held(self):
+        caches['default'].set('write_slot_0', 'other-request')
+        response = self.client.patch(f'/spycats/{self.spycat.id}/', {"salary": "1.00"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(caches['default'].get('write_slot_0'), 'other-request')
+        self.assertIsNone(caches['default'].get('write_slot_1'))
+
+    def test_waiting_duplicate_does_not_hold_a_write_slot(self):
+        payload = {"salary": "1.00"}
+        IdempotencyKey.objects.create(
+            key='abc', method='PATCH', path=f'/spycats/{self.spycat.id}/',
+            fingerprint=hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest(),
+        )
+        unrelated = []
+
+        def wait_while_another_client_writes(record):
+            unrelated.append(self.client.patch('/missions/999/', {}, format='json', REMOTE_ADDR='10.0.0.3'))
+            return record
+
+        with patch('spy_cats.idempotency.wait_for_completion', side_effect=wait_while_another_client_writes):
+            response = self.client.patch(f'/spycats/{self.spycat.id}/', payload, format='json',
+                                         HTTP_IDEMPOTENCY_KEY='abc')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(unrelated[0].status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(caches['default'].get('write_slot_0'))
+
+    def test_write_slot_is_released(self):
+        self.client.patch(f'/spycats/{self.spycat.id}/', {"salary": "1.00"}, format='json')
+        self.client.delete('/missions/999/')
+        self.assertIsNone(caches['default'].get('write_slot_0'))
+        response = self.client.patch(f'/spycats/{self.spycat.id}/', {"salary": "2.00"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class FileBasedThrottlingTests(LocMemThrottlingTests):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        settings_override = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': cache_dir.name,
+            }
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+
+
+class StartupTests(APITestCase):
+    def test_production_worker_defers_unused_imports(self):
+        report = measure_startup('test_task.settings_production', '/', {'DJANGO_WARM_UP': '0'})
+
+        self.assertEqual(report['status_code'], status.HTTP_200_OK)
+        self.assertGreater(report['import_ms'], 0)
+        self.assertNotIn('requests', report['modules_before_request'])
+        self.assertNotIn('django.contrib.sessions', report['modules_before_request'])
+
+    def test_production_warm_up_primes_url_resolver(self):
+        # A zero catalog TTL keeps warm-up from fetching TheCatAPI over the network.
+        report = measure_startup('test_task.settings_production', '/admin/', {'DJANGO_BREED_CATALOG_TTL': '0'})
+
+        self.assertEqual(report['status_code'], status.HTTP_404_NOT_FOUND)
+        self.assertIn('spy_cats.views', report['modules_before_request'])
+        self.assertIn('spy_cats.serializers', report['modules_before_request'])
+
+    def test_production_settings_require_secret_key(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='test_task.settings_production')
+        env.pop('DJANGO_SECRET_KEY', None)
+        result = subprocess.run([sys.executable, '-c', 'import django; django.setup()'],
+                                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('DJANGO_SECRET_KEY', result.stderr)
+
+    def test_production_settings_use_shared_cache(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='test_task.settings_production', DJANGO_SECRET_KEY='x')
+        result = subprocess.run(
+            [sys.executable, '-c', 'from django.conf import settings; print(settings.CACHES["default"]["BACKEND"])'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        self.assertNotIn('locmem', result.stdout)
+
+    @override_settings(BREED_CATALOG_TTL=60)
+    @patch('requests.get')
+    def test_primed_breed_catalog_is_reused(self, mock_get):
+        self.addCleanup(clear_breed_catalog)
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = [{'name': 'Siamese'}]
+
+        prime_breed_catalog()
+        payload = {"name": "Whiskers", "years_of_experience": 5, "salary": "60000.00", "breed_name": "Siamese"}
+        response = self.client.post('/spycats/', payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(get_breed_names(), {'siamese'})
+        self.assertEqual(mock_get.call_count, 1)
+
+
+class ReferenceCacheTests(APITransactionTestCase):
+    def setUp(self):
+        for reference_cache in (breeds, countries):
+            reference_cache.invalidate()
+            self.addCleanup(reference_cache.invalidate)
+        self.siamese = Breed.objects.create(name="Siamese")
+        self.persian = Breed.objects.create(name="Persian")
+        self.usa = Country.objects.create(name="USA")
+        SpyCat.objects.create(name="Whiskers", years_of_experience=5, salary="60000.00", breed=self.siamese)
+        SpyCat.objects.create(name="Mittens", years_of_experience=3, salary="40000.00", breed=self.persian)
+
+    def test_list_resolves_breeds_without_joins(self):
+        self.client.get('/spycats/')
+        with self.assertNumQueries(1):
+            response = self.client.get('/spycats/')
+        self.assertEqual([cat['breed']['name'] for cat in response.data], ["Siamese", "Persian"])
+
+    def test_mission_create_skips_country_lookup(self):
+        countries.get_or_create("USA")
+        payload = {"targets": [{"name": "Target 1", "country_name": "USA", "notes": "", "is_complete": False}]}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/missions/', payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['targets'][0]['country'], {'id': self.usa.id, 'name': "USA"})
+        self.assertFalse([q for q in queries.captured_queries if 'spy_cats_country' in q['sql']])
+
+    def test_new_rows_are_created_and_cached(self):
+        country = countries.get_or_create("Canada")
+        self.assertTrue(Country.objects.filter(id=country.id, name="Canada").exists())
+        with self.assertNumQueries(1):
+            self.assertEqual(countries.get_or_create("Canada").id, country.id)
+
+    def test_signals_invalidate_cache(self):
+        self.assertEqual(breeds.get_name(self.siamese.id), "Siamese")
+        self.siamese.name = "Siamese Royal"
+        self.siamese.save()
+        self.assertEqual(breeds.get_name(self.siamese.id), "Siamese Royal")
+
+    @override_settings(REFERENCE_CACHE_CHECK_INTERVAL=60)
+    def test_version_stamp_is_checked_once_per_interval(self):
+        self.client.get('/spycats/')
+        with patch.object(reference_module.cache, 'get', wraps=reference_module.cache.get) as cache_get:
+            response = self.client.get('/spycats/')
+        self.assertEqual(len(response.data), 2)
+        self.assertFalse([c for c in cache_get.call_args_list if c.args[0].startswith('reference_version')])
+
+    @override_settings(REFERENCE_CACHE_CHECK_INTERVAL=0)
+    def test_version_stamp_keeps_workers_coherent(self):
+        other_worker = ReferenceCache(Breed)
+        self.assertEqual(other_worker.get_name(self.persian.id), "Persian")
+
+        Breed.objects.filter(id=self.persian.id).update(name="Persian Longhair")
+        self.assertEqual(other_worker.get_name(self.persian.id), "Persian")
+        breeds.invalidate()
+        self.assertEqual(other_worker.get_name(self.persian.id), "Persian Longhair")
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_TOKEN='s3cret', PROFILING_SAMPLE_INTERVAL=0.0001)
+class ProfilingTests(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        profile_store.clear()
+        self.addCleanup(profile_store.clear)
+        breed = Breed.objects.create(name="Siamese")
+        self.spycat = SpyCat.objects.create(name="Whiskers", years_of_experience=5, salary="60000.00", breed=breed)
+        self.mission = Mission.objects.create(cat=self.spycat)
+
+    def test_header_triggers_capture_per_action(self):
+        for _ in range(2):
+            self.client.patch(f'/missions/{self.mission.id}/', {"is_complete": False}, format='json',
+                              HTTP_X_PROFILE='s3cret')
+        self.client.get('/spycats/', HTTP_X_PROFILE='s3cret')
+        self.client.get('/spycats/')
+
+        summary = self.client.get('/profiles/', HTTP_X_PROFILE_TOKEN='s3cret').json()
+        self.assertEqual(summary['MissionViewSet.partial_update']['captures'], 2)
+        self.assertEqual(summary['SpyCatViewSet.list']['captures'], 1)
+
+    def test_pstats_download(self):
+        self.client.patch(f'/missions/{self.mission.id}/', {"is_complete": False}, format='json',
+                          HTTP_X_PROFILE='s3cret')
+
+        response = self.client.get('/profiles/MissionViewSet.partial_update.pstats', HTTP_X_PROFILE_TOKEN='s3cret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with tempfile.NamedTemporaryFile(suffix='.pstats', delete=False) as dump:
+            dump.write(response.content)
+        self.addCleanup(os.remove, dump.name)
+        functions = {name for filename, line, name in pstats.Stats(dump.name).stats}
+        self.assertIn('update', functions)
+
+    def test_collapsed_stack_download(self):
+        self.client.get('/spycats/', HTTP_X_PROFILE='s3cret')
+
+        response = self.client.get('/profiles/SpyCatViewSet.list.collapsed', HTTP_X_PROFILE_TOKEN='s3cret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for line in response.content.decode().splitlines():
+            stack, count = line.rsplit(' ', 1)
+            self.assertGreater(int(count), 0)
+        response = self.client.get('/profiles/SpyCatViewSet.create.collapsed', HTTP_X_PROFILE_TOKEN='s3cret')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(PROFILING_BUFFER_SIZE=2)
+    def test_ring_buffer_is_bounded(self):
+        for _ in range(3):
+            self.client.get('/spycats/', HTTP_X_PROFILE='s3cret')
+        summary = self.client.get('/profiles/', HTTP_X_PROFILE_TOKEN='s3cret').json()
+        self.assertEqual(summary['SpyCatViewSet.list']['captures'], 2)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampling_rate_triggers_capture(self):
+        self.client.get('/spycats/')
+        self.assertIn('SpyCatViewSet.list', self.client.get('/profiles/', HTTP_X_PROFILE_TOKEN='s3cret').json())
+
+    def test_token_is_required(self):
+        self.client.get('/spycats/', HTTP_X_PROFILE='1')
+        self.client.get('/spycats/', HTTP_X_PROFILE='s3cret')
+
+        self.assertEqual(self.client.get('/profiles/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/profiles/', HTTP_X_PROFILE_TOKEN='1').status_code,
+                         status.HTTP_404_NOT_FOUND)
+        summary = self.client.get('/profiles/', HTTP_X_PROFILE_TOKEN='s3cret').json()
+        self.assertEqual(summary['SpyCatViewSet.list']['captures'], 1)
+
+    @override_settings(PROFILING_TOKEN=None)
+    def test_enabling_without_token_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ProfilingMiddleware(lambda request: None)
+
+    def test_request_is_served_when_profiler_fails(self):
+        middleware = ProfilingMiddleware(lambda request: HttpResponse('ok'))
+        request = RequestFactory().get('/spycats/', HTTP_X_PROFILE='s3cret')
+        with patch('cProfile.Profile.enable', side_effect=ValueError("Another profiling tool is already active")):
+            response = middleware(request)
+
+        self.assertEqual(response.content, b'ok')
+        self.assertFalse([thread for thread in threading.enumerate() if isinstance(thread, StackSampler)])
+        self.assertFalse(profile_store.summary())
+        self.assertFalse(capture_lock.locked())
+
+    def test_concurrent_request_is_served_unprofiled(self):
+        with capture_lock:
+            response = self.client.get('/spycats/', HTTP_X_PROFILE='s3cret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(profile_store.summary())
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_middleware_is_removed(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+        self.client.get('/spycats/', HTTP_X_PROFILE='s3cret')
+        self.assertEqual(self.client.get('/profiles/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_untriggered_overhead_benchmark(self):
+        def timed_requests():
+            return min(timeit.repeat(lambda: self.client.get('/spycats/'), number=20, repeat=5))
+
+        with self.settings(PROFILING_ENABLED=False):
+            self.client = self.client_class()
+            disabled = timed_requests()
+        self.client = self.client_class()
+        enabled = timed_requests()
+
+        self.assertFalse(profile_store.summary())
+        self.assertLess(enabled, disabled * 1.5)
+
+
+class BatchRetrieveTests(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        breed = Breed.objects.create(name="Siamese")
+        country = Country.objects.create(name="USA")
+        self.cats = [
+            SpyCat.objects.create(name=f"Cat {i}", years_of_experience=i, salary="1000.00", breed=breed)
+            for i in range(20)
+        ]
+        self.missions = []
+        for cat in self.cats:
+            mission = Mission.objects.create(cat=cat)
+            Target.objects.create(mission=mission, name="Target", country=country)
+            self.missions.append(mission)
+
+    def test_missions_batch_keeps_order_and_reports_missing(self):
+        ids = [self.missions[3].id, 9999, self.missions[0].id, self.missions[3].id]
+        response = self.client.get('/missions/batch/', {'ids': ','.join(map(str, ids))})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([m['id'] for m in response.data['results']], [self.missions[3].id, self.missions[0].id])
+        self.assertEqual(response.data['results'][0]['targets'][0]['country']['name'], "USA")
+        self.assertEqual(response.data['missing'], [9999])
+
+    def test_spycats_batch_with_post_body(self):
+        ids = [cat.id for cat in reversed(self.cats)]
+        response = self.client.post('/spycats/batch/', {'ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([cat['id'] for cat in response.data['results']], ids)
+        self.assertEqual(response.data['missing'], [])
+
+    def test_repeated_query_params(self):
+        response = self.client.get(f'/spycats/batch/?ids={self.cats[1].id}&ids={self.cats[0].id}')
+        self.assertEqual([cat['name'] for cat in response.data['results']], ["Cat 1", "Cat 0"])
+
+    def test_invalid_ids(self):
+        self.assertEqual(self.client.get('/missions/batch/').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/missions/batch/', {'ids': '1,abc'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post('/spycats/batch/', {'ids': 5}, format='json').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        for ids in ([1.9], [True], ["1"], [None], [10 ** 25]):
+            self.assertEqual(self.client.post('/spycats/batch/', {'ids': ids}, format='json').status_code,
+                             status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post('/spycats/batch/', [1, 2], format='json').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/spycats/batch/', {'ids': '99999999999999999999999'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/spycats/batch/', {'ids': str(2 ** 63 - 1)})
+        self.assertEqual(response.data['missing'], [2 ** 63 - 1])
+        with self.settings(BATCH_MAX_IDS=2):
+            self.assertEqual(self.client.get('/spycats/batch/', {'ids': '1,2,3'}).status_code,
+                             status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(WRITE_CONCURRENCY_LIMIT=0)
+    def test_post_batch_is_treated_as_read(self):
+        response = self.client.post('/spycats/batch/', {'ids': [self.cats[0].id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_batch_against_single_gets_benchmark(self):
+        ids = [mission.id for mission in self.missions]
+        self.client.get('/missions/batch/', {'ids': ','.join(map(str, ids))})
+
+        with CaptureQueriesContext(connection) as single_queries:
+            start = timeit.default_timer()
+            for pk in ids:
+                self.client.get(f'/missions/{pk}/')
+            singles = timeit.default_timer() - start
+        with CaptureQueriesContext(connection) as batch_queries:
+            start = timeit.default_timer()
+            response = self.client.get('/missions/batch/', {'ids': ','.join(map(str, ids))})
+            batched = timeit.default_timer() - start
+
+        self.assertEqual(len(response.data['results']), len(ids))
+        self.assertEqual(len(batch_queries.captured_queries), 2)
+        self.assertGreaterEqual(len(single_queries.captured_queries), 2 * len(ids))
+        self.assertLess(batched, singles)
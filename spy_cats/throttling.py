@@ -0,0 +1,139 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+def get_limiter_cache():
+    return caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+
+
+def is_read_request(request, view):
+    return request.method in SAFE_METHODS or getattr(view, 'action', None) in getattr(view, 'read_actions', ())
+
+
+class ServiceOverloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many write requests in progress, try again later.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait, detail=None, code=None):
+        super().__init__(detail, code)
+        self.wait = wait
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket per client, with separate 'read' and 'write' buckets.
+
+    Rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] in the usual
+    DRF '<num>/<period>' form: <num> is the burst size and the bucket refills
+    at <num> tokens per <period>.
+
+    The bucket is read and written back without a lock, like DRF's own
+    throttles, so concurrent requests from one client on different workers
+    can both spend the same token. The limit is approximate under such races.
+    """
+    cache_format = 'throttle_%(scope)s_%(ident)s'
+
+    def __init__(self):
+        self.wait_time = None
+
+    @property
+    def cache(self):
+        return get_limiter_cache()
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        self.scope = 'read' if is_read_request(request, view) else 'write'
+        self.rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if self.rate is None:
+            return True
+        capacity, period = self.parse_rate(self.rate)
+        refill = capacity / period
+
+        key = self.get_cache_key(request, view)
+        now = self.timer()
+        tokens, last = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * refill)
+
+        if tokens < 1:
+            self.wait_time = (1 - tokens) / refill
+            self.cache.set(key, (tokens, now), period)
+            return False
+        self.cache.set(key, (tokens - 1, now), period)
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class BoundedWriteConcurrencyMixin:
+    """
+    Caps the number of write requests handled at once across all workers,
+    answering 503 with Retry-After when the cap is reached.
+
+    Each in-flight write holds one of WRITE_CONCURRENCY_LIMIT slot keys,
+    taken with cache.add() and released with delete(). add() is atomic on
+    the local-memory, Redis and Memcached backends; FileBasedCache checks and
+    writes separately, so there the cap is best-effort. A slot expires after
+    write_slot_timeout seconds, so a killed worker cannot leak it for good.
+    Handlers that block on other requests, like an idempotent duplicate
+    waiting for the original, give their slot back while they wait.
+    """
+    write_slot_prefix = 'write_slot'
+    write_slot_timeout = 60
+
+    def get_write_concurrency_limit(self):
+        return getattr(settings, 'WRITE_CONCURRENCY_LIMIT', None)
+
+    def acquire_write_slot(self, limit):
+        cache = get_limiter_cache()
+        token = uuid4().hex
+        for index in range(limit):
+            key = f'{self.write_slot_prefix}_{index}'
+            if cache.add(key, token, self.write_slot_timeout):
+                return key, token
+        return None
+
+    def release_write_slot(self, slot):
+        cache = get_limiter_cache()
+        key, token = slot
+        if cache.get(key) == token:
+            cache.delete(key)
+
+    def release_held_write_slot(self):
+        if self.write_slot is not None:
+            self.release_write_slot(self.write_slot)
+            self.write_slot = None
+
+    def take_write_slot(self):
+        limit = self.get_write_concurrency_limit()
+        if limit is None or is_read_request(self.request, self) or self.write_slot is not None:
+            return
+        self.write_slot = self.acquire_write_slot(limit)
+        if self.write_slot is None:
+            raise ServiceOverloaded(wait=1)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.take_write_slot()
+
+    def dispatch(self, request, *args, **kwargs):
+        self.write_slot = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self.write_slot is not None:
+                self.release_write_slot(self.write_slot)
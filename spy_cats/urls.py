@@ -1,13 +1,18 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MissionViewSet, SpyCatViewSet
+from .views import MissionViewSet, SpyCatViewSet, ArchivedMissionViewSet
+from .profiling import profile_list, profile_pstats, profile_collapsed
 
 router = DefaultRouter()
 app_name = "spy_cats"
 
+router.register(r'missions/archive', ArchivedMissionViewSet, basename='archived-mission')
 router.register(r'missions', MissionViewSet, basename='mission')
 router.register(r'spycats', SpyCatViewSet, basename='spycat')
 
 urlpatterns = [
+    path('profiles/', profile_list, name='profile-list'),
+    path('profiles/<str:action>.pstats', profile_pstats, name='profile-pstats'),
+    path('profiles/<str:action>.collapsed', profile_collapsed, name='profile-collapsed'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,27 +1,36 @@
 from rest_framework import viewsets, status
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
-import requests
-from .models import SpyCat, Mission, Target, Breed, Country
-from .serializers import SpyCatSerializer, MissionSerializer
+from .models import SpyCat, Mission, Target, Breed, Country, ArchivedMission
+from .serializers import SpyCatSerializer, MissionSerializer, ArchivedMissionSerializer
 from django.core.exceptions import ValidationError
+from .batch import BatchRetrieveMixin
+from .breeds import BreedCatalogUnavailable, get_breed_names
+from .idempotency import idempotent, mark_transient
+from .reference import breeds, countries
+from .throttling import BoundedWriteConcurrencyMixin
 
-class SpyCatViewSet(viewsets.ModelViewSet):
+class SpyCatViewSet(BatchRetrieveMixin, BoundedWriteConcurrencyMixin, viewsets.ModelViewSet):
     queryset = SpyCat.objects.all()
     serializer_class = SpyCatSerializer
 
     def validate_breed_name(self, breed_name):
-        response = requests.get('https://api.thecatapi.com/v1/breeds')
-        if response.status_code == 200:
-            breeds_data = response.json()
-            breed_names = [breed['name'].lower() for breed in breeds_data]
+        breed_names = get_breed_names()
+        if breed_names is not None:
             if breed_name.lower() in breed_names:
-                breed, created = Breed.objects.get_or_create(name=breed_name)
-                return breed
+                return breeds.get_or_create(breed_name)
             else:
                 raise ValidationError({'breed_name': 'Invalid breed name.'})
         else:
-            raise ValidationError({'breed_name': 'Could not validate breed name at this time.'})
+            raise BreedCatalogUnavailable({'breed_name': 'Could not validate breed name at this time.'})
 
+    def breed_error_response(self, error):
+        response = Response(error.message_dict, status=status.HTTP_400_BAD_REQUEST)
+        if isinstance(error, BreedCatalogUnavailable):
+            mark_transient(response)
+        return response
+
+    @idempotent
     def create(self, request, *args, **kwargs):
         breed_name = request.data.get('breed_name')
         if not breed_name:
@@ -29,7 +38,7 @@ class SpyCatViewSet(viewsets.ModelViewSet):
         try:
             breed = self.validate_breed_name(breed_name)
         except ValidationError as e:
-            return Response(e.message_dict, status=status.HTTP_400_BAD_REQUEST)
+            return self.breed_error_response(e)
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -38,6 +47,7 @@ class SpyCatViewSet(viewsets.ModelViewSet):
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    @idempotent
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         breed_name = request.data.get('breed_name')
@@ -45,7 +55,7 @@ class SpyCatViewSet(viewsets.ModelViewSet):
             try:
                 breed = self.validate_breed_name(breed_name)
             except ValidationError as e:
-                return Response(e.message_dict, status=status.HTTP_400_BAD_REQUEST)
+                return self.breed_error_response(e)
         else:
             breed = None
 
@@ -59,10 +69,17 @@ class SpyCatViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class MissionViewSet(viewsets.ModelViewSet):
+class MissionViewSet(BatchRetrieveMixin, BoundedWriteConcurrencyMixin, viewsets.ModelViewSet):
     queryset = Mission.objects.all()
     serializer_class = MissionSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'batch'):
+            queryset = queryset.prefetch_related('targets')
+        return queryset
+
+    @idempotent
     def create(self, request, *args, **kwargs):
         data_copy = request.data.copy()
         targets_data = data_copy.pop('targets', [])
@@ -100,7 +117,7 @@ class MissionViewSet(viewsets.ModelViewSet):
                 mission.delete()
                 return Response({"detail": "Each target must have a country_name."}, status=status.HTTP_400_BAD_REQUEST)
 
-            country, created = Country.objects.get_or_create(name=country_name)
+            country = countries.get_or_create(country_name)
             Target.objects.create(mission=mission, country=country, **target_data)
 
         mission.check_completion()
@@ -109,6 +126,7 @@ class MissionViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+    @idempotent
     def update(self, request, *args, **kwargs):
         mission = self.get_object()
         data = request.data.copy()
@@ -179,4 +197,15 @@ class MissionViewSet(viewsets.ModelViewSet):
         if not mission.can_delete():
             return Response({'detail': 'Cannot delete a mission assigned to a cat.'}, status=status.HTTP_400_BAD_REQUEST)
         mission.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ArchivedMissionPagination(CursorPagination):
+    ordering = ('-completed_at', '-id')
+    page_size = 50
+
+
+class ArchivedMissionViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ArchivedMission.objects.prefetch_related('targets')
+    serializer_class = ArchivedMissionSerializer
+    pagination_class = ArchivedMissionPagination
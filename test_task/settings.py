@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'spy_cats.profiling.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -123,3 +124,60 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Cache
+# Rate limiter state lives here, so every worker must point at the same backend
+# (e.g. FileBasedCache on a shared path, Redis or Memcached) in multi-process deployments.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+THROTTLE_CACHE_ALIAS = 'default'
+
+REST_FRAMEWORK = {
+    'DEFAULT_THROTTLE_CLASSES': [
+        'spy_cats.throttling.TokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'read': '600/min',
+        'write': '120/min',
+    },
+}
+
+# Maximum number of write requests processed at the same time across all workers
+WRITE_CONCURRENCY_LIMIT = 8
+
+# Idempotency-Key support for mission and spy cat writes
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+IDEMPOTENCY_WAIT_TIMEOUT = 10
+
+# Pending keys older than this are treated as abandoned by a killed worker and can be reclaimed
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+# Seconds to keep TheCatAPI breed catalog in process memory, 0 fetches it on every validation
+BREED_CATALOG_TTL = 0
+
+# Prime URL resolver, serializer fields and breed catalog in SpyCatsConfig.ready()
+WARM_UP_ON_STARTUP = False
+
+# Seconds between checks of the shared Breed/Country version stamps, see spy_cats.reference
+REFERENCE_CACHE_CHECK_INTERVAL = 1.0
+
+# Maximum number of ids accepted by the /missions/batch/ and /spycats/batch/ actions
+BATCH_MAX_IDS = 1000
+
+# Opt-in request profiling, see spy_cats.profiling. PROFILING_TOKEN must be set when enabled:
+# requests are profiled when their X-Profile header matches it, and /profiles/ requires it in X-Profile-Token.
+PROFILING_ENABLED = False
+
+PROFILING_SAMPLE_RATE = 0.0
+
+PROFILING_SAMPLE_INTERVAL = 0.005
+
+PROFILING_BUFFER_SIZE = 100
+
+PROFILING_TOKEN = None
@@ -0,0 +1,67 @@
+"""
+Production settings for test_task project.
+
+Select with DJANGO_SETTINGS_MODULE=test_task.settings_production. Debug and
+its query logging are off, apps the JSON API does not use are left out so
+workers boot faster, and the first-request costs are paid at startup.
+"""
+
+import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured("Set the DJANGO_SECRET_KEY environment variable.")
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'rest_framework',
+    'spy_cats',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'spy_cats.profiling.ProfilingMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+TEMPLATES = []
+
+# Rate limiter slots and reference-data version stamps must be visible to every
+# worker, so the per-process LocMemCache from the base settings is replaced.
+# Set DJANGO_CACHE_BACKEND/DJANGO_CACHE_LOCATION to Redis or Memcached in
+# production. The FileBasedCache fallback only suits small single-host
+# deployments: it lists and culls its directory once MAX_ENTRIES is reached,
+# which would drop in-flight write slots, so the limit is raised well above
+# the two throttle keys kept per client.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'spy_cats_cache')),
+    }
+}
+
+if CACHES['default']['BACKEND'].endswith('FileBasedCache'):
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': int(os.environ.get('DJANGO_CACHE_MAX_ENTRIES', 100000))}
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+}
+
+BREED_CATALOG_TTL = int(os.environ.get('DJANGO_BREED_CATALOG_TTL', 60 * 60))
+
+WARM_UP_ON_STARTUP = os.environ.get('DJANGO_WARM_UP', '1') == '1'